@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:05:37 2026
+
+@author: frobledo
+
+Compares the peak memory (RSS) of collecting the issues of a repository
+with 10 000 issues:
+    lists: the previous code, copied below. Every raw issue dict is kept
+           until the last page, then parsed into lists of values.
+    records: the issues job as the compiler runs it through the pipeline,
+             parsing every page into Issue records as it arrives.
+
+The GitHub API is replaced by generated pages so no api key is needed.
+Every mode runs in its own process, as the peak RSS cannot go down.
+
+usage: python benchmarks/issues_memory.py [-n <issues>]
+"""
+
+import argparse
+import functools
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repositories import github
+from utils import pipeline
+
+MODES: list = ["lists", "records"]
+
+def _fake_issue(number:int) -> dict:
+    # Similar in size to a real issue, most of it is never saved
+    return {"number": number, "state": "closed" if number % 3 else "open",
+            "user": {"login": "user{}".format(number % 50), "id": number, "type": "User",
+                     "avatar_url": "https://avatars.githubusercontent.com/u/{}?v=4".format(number)},
+            "created_at": "2024-01-01T10:00:00Z",
+            "closed_at": None if number % 3 == 0 else "2024-02-01T10:00:00Z",
+            "comments": number % 7, "title": "Issue {}".format(number),
+            "body": "Steps to reproduce the problem. " * 40,
+            "labels": [{"name": "bug", "color": "d73a4a", "description": "Something isn't working"}]}
+
+def _fake_fetch(issues:int, url:str, apikey:str, owner:str, repo:str) -> bytes:
+    # Every page is generated when requested, as the API would send it
+    start:int = (int(url.rsplit("=", 1)[1])-1)*github.GITHUB_API_PER_PAGE_MAX # Pages start at 1
+    return json.dumps([_fake_issue(number) for number in range(start, min(start+github.GITHUB_API_PER_PAGE_MAX, issues))]).encode()
+
+# Copy of the previous code, kept as the baseline
+def _lists_connect_to_API(url:str, apikey:str, owner:str, repo:str) -> dict:
+    return json.loads(github.fetch_from_API(url, apikey, owner, repo))
+
+def _lists_parse_issue(data:dict):
+    id:str = str(data["number"])
+    open:str = True if data["state"] == "open" else False
+    username_poster:str = data["user"]["login"]
+    creation_date:str = data["created_at"]
+    closed_date:str = None if data["closed_at"] == "null" else data["closed_at"]
+    number_of_comments:int = data["comments"]
+    is_pull_request:bool = "pull_request" in data.keys()
+    return [id, open, username_poster, creation_date, closed_date, number_of_comments, is_pull_request]
+
+def _lists_get_issues(issues_url:str, apikey:str, owner:str, repo:str):
+    issues = []
+    page:int = 1 # The previous code started at 0, which downloads the first page twice
+    while True:
+        API_PAGE:str = issues_url+str(page)
+        api_issues = _lists_connect_to_API(API_PAGE, apikey, owner, repo)
+        if api_issues == []: break
+        else :
+            issues += api_issues
+            page += 1
+        # The previous limit of 40 pages is left out to reach the same number of issues
+    info:list = list(map(_lists_parse_issue, issues))
+    return info
+
+def _lists_save_issues(issues:list, filename:str):
+    if (not os.path.exists(filename)):
+        with open(filename, "wt") as head_writer:
+            head_writer.write(github.ISSUES_HEADER)
+    saved_issues = []
+    with open(filename, "rt") as saved_issues_fhand:
+        saved_issues_fhand.readline()
+        for line in saved_issues_fhand:
+            saved_issues.append(line.strip("\n").split(","))
+    with open(filename, "wt") as body_writer:
+        body_writer.write(github.ISSUES_HEADER)
+        for issue in issues:
+            for idx, saved_issue in enumerate(saved_issues):
+                if issue[0] == saved_issue[0]:
+                    saved_issues[idx] = issue
+                    break
+            else:
+                saved_issues.append(issue)
+        for saved_issue in saved_issues:
+            body_writer.write(",".join(map(str, saved_issue))+"\n")
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024 # kilobytes in linux
+
+def _run_mode(mode:str, issues:int) -> None:
+    github.fetch_from_API = functools.partial(_fake_fetch, issues)
+    github.ISSUES_MAX_PAGES = issues//github.GITHUB_API_PER_PAGE_MAX+2 # Reach the empty page
+    savefile:str = os.path.join(tempfile.mkdtemp(), "issues.csv")
+    baseline:float = _peak_rss_mb()
+    if mode == "lists":
+        _lists_save_issues(_lists_get_issues(github.GITHUB_ISSUES_API_URL, "", "o", "r"), savefile)
+    else:
+        # The same job that get_github_jobs builds in github-stats-compiler.py
+        job = pipeline.Job("issues data of o/r", "Github",
+                           functools.partial(github.fetch_issue_pages, github.GITHUB_ISSUES_API_URL, "", "o", "r"),
+                           github.parse_issue_page,
+                           lambda records: github.save_issues(records, savefile),
+                           paged=True, merge=True)
+        pipeline.run([job])
+    with open(savefile, "rt") as freader:
+        saved:int = sum(1 for _ in freader)-1
+    print(json.dumps({"mode": mode, "issues": saved, "peak_rss_mb": _peak_rss_mb(), "baseline_mb": baseline}))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--issues", type=int, default=10000, help="Issues in the repository")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        _run_mode(args.mode, args.issues)
+        return
+    for mode in MODES:
+        output = subprocess.run([sys.executable, __file__, "--mode", mode, "-n", str(args.issues)],
+                                check=True, capture_output=True, text=True).stdout
+        result:dict = json.loads(output)
+        print("{mode:>8}: {issues} issues saved, peak RSS {peak:.1f} MB ({growth:.1f} MB over the start)".format(
+            mode=mode, issues=result["issues"], peak=result["peak_rss_mb"], growth=result["peak_rss_mb"]-result["baseline_mb"]))
+
+if __name__ == "__main__":
+    main()
@@ -15,13 +15,15 @@ usage: github-stats-compiler.py -k <github_passkey> -u <owner> -r <repository
 # Modules needed to connect to the API, parse the info and log the data
 import argparse
 import datetime
+import functools
+import json
 import logging
 import os
 import urllib.request
 
 # Modules to connect to the services (including backup)
-from utils import backup, config_reader
-from repositories import docker, github, conda
+from utils import backup, config_reader, pipeline
+from repositories import bioconductor, conda, cran, docker, github
 
 def parseargs():
     """
@@ -45,121 +47,115 @@ def parseargs():
                         default=False)
     return parser.parse_args()
 
-def get_github_stats(user:str, repo:str, apikey:str, save_prefix:str):
-    logger = logging.getLogger("github")
+GITHUB_HINT:str = "If its 401 Unauthorized or 403 Forbidden, please check that the api key has push permission"
+
+def get_github_jobs(user:str, repo:str, apikey:str, save_prefix:str) -> list:
+    # Traffic endpoints share the same fetch, only the parser and saver change
+    traffic:list = [("clone info", github.GITHUB_CLONES_API_URL, functools.partial(github.parse_traffic, key=github.CLONES), github.save_clone_info, "_clone.csv"),
+                    ("views data", github.GITHUB_TRAFFIC_VIEWS, functools.partial(github.parse_traffic, key=github.VIEWS), github.save_views_info, "_views.csv"),
+                    ("popular pages data", github.GITHUB_POPULAR_PATHS, json.loads, github.save_pages_info, "_pages.csv"),
+                    ("referrals data", github.GITHUB_REFFERAL_SOURCE, json.loads, github.save_referral_info, "_referrals.csv")]
+    jobs:list = [pipeline.Job("{} of {}/{}".format(name, user, repo), "Github",
+                              functools.partial(github.fetch_from_API, url, apikey, user, repo),
+                              parser,
+                              functools.partial(_save_to, saver, save_prefix+suffix),
+                              hint=GITHUB_HINT)
+                 for name, url, parser, saver, suffix in traffic]
+    jobs.append(pipeline.Job("download info of {}/{}".format(user, repo), "Github",
+                             functools.partial(github.fetch_releases, user, repo),
+                             github.parse_downloads_of_releases,
+                             functools.partial(_save_to, github.save_download_info, save_prefix+"_downloads.csv")))
+    jobs.append(pipeline.Job("issues data of {}/{}".format(user, repo), "Github",
+                             functools.partial(github.fetch_issue_pages, github.GITHUB_ISSUES_API_URL, apikey, user, repo),
+                             github.parse_issue_page,
+                             functools.partial(_save_to, github.save_issues, save_prefix+"_issues.csv"),
+                             paged=True, merge=True, hint=GITHUB_HINT))
+    return jobs
+
+def _save_to(saver, filename:str, data):
+    saver(data, filename)
+
+def _save_docker_stats(filename:str, stats:tuple):
+    docker.save_docker_stats(stats[0], stats[1], filename)
+
+def _save_cran_stats(packages:dict, downloads:list):
+    for package, rows in downloads:
+        logging.getLogger("CRAN").info("{n} new days of downloads for {package}".format(n=len(rows), package=package))
+        cran.save_cran_stats(rows, packages[package])
+
+def get_docker_jobs(user:str, repo:str, apikey:str, save_file:str) -> list:
+    return [pipeline.Job("docker stats of {}/{}".format(user, repo), "Docker",
+                         functools.partial(docker.fetch_from_docker_API, docker.REPOSITORY_API_URL, user, repo),
+                         docker.parse_docker_stats,
+                         functools.partial(_save_docker_stats, save_file))]
+
+def get_bioconductor_jobs(package:str, savefile:str) -> list:
     try:
-        # Connect to the api, get the info and write it into a csv file
-        # An HTTPError is raised if could not connect.
-        # TODO: Show the exact error code in the log
-        clone_info = github.connect_to_API(github.GITHUB_CLONES_API_URL, apikey, user, repo)
-        logger.info("Clone info retrieved")
-        clone_file:str = save_prefix+"_clone.csv"
-        logger.info("Saving clone info into {file}".format(file=clone_file))
-        github.save_clone_info(clone_info, clone_file)
-    except urllib.error.HTTPError as httperror:
-        logger.error("Could not connect to GITHUB API due to the error: {error}. If its 401 Unauthorized or 403 Forbidden, please check that the api key has push permission".format(error=httperror))
-    try:
-        logger.info("Connecting to GITHUB API to get download info")
-        download_info = github.get_downloads_of_release(user, repo)
-        download_file:str = save_prefix+"_downloads.csv"
-        logger.info("Download info retrieved")
-        try:
-            github.save_download_info(download_info, download_file)
-        except Exception as e:
-            logger.error("Could connect to API but not save the data. Check disk usage or availability")
-            print(e)
-    except Exception:
-        logger.error("Could not get info from: "+github.GITHUB_API_URL.format(owner=user, repo=repo))
-    
-    try:
-        logger.info("Connecting to GITHUB API to get views data")
-        views = github.connect_to_API(github.GITHUB_TRAFFIC_VIEWS, apikey, user, repo)
-        views_file:str = save_prefix+"_views.csv"
-        logger.info("Retrieved views data")
-        github.save_views_info(views, views_file)
-    except urllib.error.HTTPError as httperror:
-        logger.error("Could not connect to GITHUB API due to the error: {error}. If its 401 Unauthorized or 403 Forbidden, please check that the api key has push permission".format(error=httperror))
-    try:
-        logger.info("Connecting to GITHUB API to get popular pages data")
-        pages_file:str = save_prefix+"_pages.csv"
-        pages = github.connect_to_API(github.GITHUB_POPULAR_PATHS, apikey, user, repo)
-        logger.info("Retrieved popular pages data")
-        github.save_pages_info(pages, pages_file)
-    except urllib.error.HTTPError as httperror:
-        logger.error("Could not connect to GITHUB API due to the error: {error}. If its 401 Unauthorized or 403 Forbidden, please check that the api key has push permission".format(error=httperror))
-    try:
-        # Referrals data
-        logger.info("Connecting to GITHUB API to get referrals data")
-        referrals = github.connect_to_API(github.GITHUB_REFFERAL_SOURCE, apikey, user, repo)
-        referrals_file:str = save_prefix+"_referrals.csv"
-        logger.info("Saving referral info")
-        github.save_referral_info(referrals, referrals_file)
-    except urllib.error.HTTPError as httperror:
-        logger.error("Could not connect to GITHUB API due to the error: {error}. If its 401 Unauthorized or 403 Forbidden, please check that the api key has push permission".format(error=httperror))
-    pass
-    try:
-        # Issues data
-        logger.info("Connecting to GITHUB API to get issues data")
-        issues = github.get_issues(github.GITHUB_ISSUES_API_URL, apikey, user, repo)
-        github.save_issues(issues, save_prefix+"_issues.csv")
-    except urllib.error.HTTPError as httperror:
-        logger.error("Could not connect to GITHUB API due to the error: {error}. If its 401 Unauthorized or 403 Forbidden, please check that the api key has push permission".format(error=httperror))
-
-def get_docker_stats(user:str, repo:str, apikey:str, save_file:str):
-    logging.getLogger("Docker")
-    try:
-        docker_stats = docker.get_docker_stats(apikey, user, repo)
-        docker.save_docker_stats(docker_stats[0], docker_stats[1], save_file)
-    except urllib.error.HTTPError as httperror:
-        logger_docker = logging.getLogger("Docker")
-        logger_docker.error("Error connecting to Dockerhub: {error}".format(error=httperror))
-
-def get_bioconductor_stats(package:str, savefile:str):
-    pass
-
-def get_conda_stats(owner:str, repo:str, savefile:str):
-    logger_conda = logging.getLogger("Conda")
-    try:
-        conda_stats = conda.get_conda_stats(conda.CONDA_API, owner, repo)
-        conda.save_conda_stats(conda_stats, savefile)
-    except urllib.error.HTTPError as httperror:
-        logger_conda.error("Error connecting to Conda API: {error}".format(error=httperror))
-
-    pass
-
-def get_stats_for_tool(tool:dict, tool_name:str, folder:str):
+        since = bioconductor.last_collected_month(savefile)
+    except (OSError, ValueError) as error:
+        logging.getLogger("Bioconductor").error("Could not read {file}, skipping {package}: {error}".format(file=savefile, package=package, error=error))
+        return []
+    return [pipeline.Job("bioconductor stats of {}".format(package), "Bioconductor",
+                         functools.partial(bioconductor.fetch_bioconductor_stats, package),
+                         functools.partial(bioconductor.parse_bioconductor_stats, since=since),
+                         functools.partial(_save_to, bioconductor.save_bioconductor_stats, savefile))]
+
+def get_cran_jobs(packages:dict) -> list:
+    """
+    All CRAN packages are queried together, as cranlogs accepts several
+    packages in one query. packages is {package: savefile}
+    """
+    since, end = cran.days_to_request(packages)
+    if not since:
+        return []
+    return [pipeline.Job("cran stats of {} packages".format(len(since)), "CRAN",
+                         functools.partial(cran.fetch_cran_pages, since, end),
+                         functools.partial(cran.parse_cran_page, since=since),
+                         functools.partial(_save_cran_stats, packages),
+                         paged=True)]
+
+def get_conda_jobs(owner:str, repo:str, savefile:str) -> list:
+    return [pipeline.Job("conda stats of {}/{}".format(owner, repo), "Conda",
+                         functools.partial(conda.fetch_conda_stats, conda.CONDA_API, owner, repo),
+                         conda.parse_conda_stats,
+                         functools.partial(_save_to, conda.save_conda_stats, savefile))]
+
+def get_jobs_for_tool(tool:dict, tool_name:str, folder:str) -> list:
     # Logger for the tool
     logger = logging.getLogger(tool_name)
     logger.info("Starting: {}".format(tool_name))
 
+    jobs:list = []
     for repository in tool.keys():
-        logger.info("Connecting to {}".format(repository))
+        logger.info("Adding jobs for {}".format(repository))
         match repository:
 
             case "github":
-                get_github_stats(tool[repository]["owner"],
-                                 tool[repository]["repo"],
-                                 tool[repository]["apikey"],
-                                 os.path.join(folder, tool[repository]["savefile_prefix"]))
+                jobs += get_github_jobs(tool[repository]["owner"],
+                                        tool[repository]["repo"],
+                                        tool[repository]["apikey"],
+                                        os.path.join(folder, tool[repository]["savefile_prefix"]))
 
             case "docker":
-                get_docker_stats(tool[repository]["owner"],
-                                 tool[repository]["repo"],
-                                 tool[repository]["apikey"],
-                                 os.path.join(folder, tool[repository]["savefile"]))
+                jobs += get_docker_jobs(tool[repository]["owner"],
+                                        tool[repository]["repo"],
+                                        tool[repository]["apikey"],
+                                        os.path.join(folder, tool[repository]["savefile"]))
 
             case "conda":
-                get_conda_stats(tool[repository]["owner"],
-                                tool[repository]["repo"],
-                                os.path.join(folder, tool[repository]["savefile"]))
+                jobs += get_conda_jobs(tool[repository]["owner"],
+                                       tool[repository]["repo"],
+                                       os.path.join(folder, tool[repository]["savefile"]))
             case "cran":
-                pass
+                # Collected in bulk for every tool once all of them are done
+                logger.info("CRAN downloads of {} will be collected with the other CRAN packages".format(tool[repository]["package"]))
 
             case "bioconductor": 
-                get_bioconductor_stats(tool[repository]["package"],
-                                       os.path.join(folder, tool[repository]["savefile"]))
+                jobs += get_bioconductor_jobs(tool[repository]["package"],
+                                              os.path.join(folder, tool[repository]["savefile"]))
             case _:
                 logging.error(f"Repository not supported: {repository}")
+    return jobs
 
 def main():
     # There are a lot of errors to handle when trying to connect to the API.
@@ -191,10 +187,21 @@ def main():
     logger.info("{} tools to monitor".format(len(tools_data)))
     logger.debug("{} tools ".format(tools_data))
 
+    jobs:list = []
     for tool in tools_data.keys():
-        get_stats_for_tool(tools_data[tool], tool, config["root_folder"])
-
-    logger.info("Connecting to GITHUB API to get clone info")
+        jobs += get_jobs_for_tool(tools_data[tool], tool, config["root_folder"])
+
+    cran_packages:dict = {tools_data[tool]["cran"]["package"]: os.path.join(config["root_folder"], tools_data[tool]["cran"]["savefile"])
+                          for tool in tools_data.keys() if "cran" in tools_data[tool]}
+    if cran_packages:
+        logger.info("Downloads of {} CRAN packages will be requested together".format(len(cran_packages)))
+        jobs += get_cran_jobs(cran_packages)
+
+    # Optional tuning of the collection, see template.json
+    pipeline_config:dict = config.get("pipeline", {})
+    pipeline.run(jobs,
+                 pipeline_config.get("fetchers", pipeline.FETCHERS),
+                 pipeline_config.get("queue_size", pipeline.QUEUE_SIZE))
 
     if (config["backup"]["activate"]):
         backup_data = config["backup"]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:02:11 2026
+
+@author: frobledo
+"""
+
+import datetime
+import logging
+import os
+import urllib.request
+from typing import Optional
+
+# Bioconductor publishes one tab separated file per package with monthly downloads
+BASE_URL: str = "https://bioconductor.org/packages/stats/bioc/{package}/{package}_stats.tab"
+MONTHS: dict = {month: idx for idx, month in enumerate(["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                                                         "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1)}
+logger = logging.getLogger("Bioconductor")
+
+def last_collected_month(filename:str) -> Optional[str]:
+    """
+    Parameters
+    ----------
+    filename : str
+        The csv file where the downloads of a package are saved.
+
+    Returns
+    -------
+    Optional[str]
+        The last month (YYYY-MM) saved in the file, or None if nothing was collected yet.
+    """
+    if (not os.path.exists(filename)):
+        return None
+    with open(filename, "rt") as freader:
+        freader.readline() # Skip headers
+        months = [line.split(",")[0] for line in freader if line.strip()]
+    return max(months) if months else None
+
+def fetch_bioconductor_stats(package:str) -> bytes:
+    url:str = BASE_URL.format(package=package)
+    logger.info("Connecting to {}".format(url))
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+def parse_bioconductor_stats(data:bytes, since:Optional[str]) -> list:
+    """
+    Parameters
+    ----------
+    data : bytes
+        The content of the stats file of a package.
+    since : str
+        The last month (YYYY-MM) already saved, or None to keep every month.
+
+    Returns
+    -------
+    list
+        (month, distinct IPs, downloads) rows of the months after since.
+        The current month is still being counted, so it is left for a later run.
+    """
+    current_month:str = datetime.date.today().strftime("%Y-%m")
+    rows:list = []
+    lines = data.decode("utf-8").splitlines()
+    for line in lines[1:]: # First line contains the headers
+        fields = line.split("\t")
+        if len(fields) != 4 or fields[1] not in MONTHS: # Yearly totals use "all" as month
+            continue
+        month:str = "{year}-{month:02d}".format(year=fields[0], month=MONTHS[fields[1]])
+        if month >= current_month or (since is not None and month <= since):
+            continue
+        rows.append((month, fields[2], fields[3]))
+    return sorted(rows)
+
+def save_bioconductor_stats(downloads:list, bioconductor_file:str) -> None:
+    if (not os.path.exists(bioconductor_file)):
+        logger.info("File {file} does not exist. Creating with headers".format(file=bioconductor_file))
+        with open(bioconductor_file, "wt") as fwriter:
+            fwriter.write("Date,Distinct_IPs,Downloads\n")
+    with open(bioconductor_file, "at") as fwriter:
+        [fwriter.write(",".join(row)+"\n") for row in downloads]
@@ -11,17 +11,20 @@ import datetime
 import os
 import json
 import logging
-import urllib
+import urllib.request
 
 CONDA_API:str = "https://api.anaconda.org/package/{owner}/{repo}"
 logger = logging.getLogger("Conda")
 
-def get_conda_stats(API_url:str, owner:str, repo:str) -> list:
+def fetch_conda_stats(API_url:str, owner:str, repo:str) -> bytes:
     url:str = API_url.format(owner=owner, repo=repo)
     logging.info("Connecting to {}".format(url))
     request = urllib.request.Request(url)
-    response = urllib.request.urlopen(request)
-    json_data =  json.loads(response.read())
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+def parse_conda_stats(response:bytes) -> str:
+    json_data =  json.loads(response)
     date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     logging.info("Date recieved: {date}".format(date=date))
     ## For every version (represented by every row) we have date, version and absolute number of downloads
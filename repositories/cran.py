@@ -6,20 +6,131 @@ Created on Tue Dec 10 11:17:49 2024
 @author: frobledo
 """
 
+import datetime
+import json
 import logging
+import os
 import urllib.request
+from typing import Optional
 
 # Note that cranlogs only shows downloads since RStudio started tracking them in 2012
-BASE_URL: str = "https://cranlogs.r-pkg.org/badges/grand-total/{package}"
-logger = logging.getLogger("Bioconductor")
+# The daily endpoint accepts a comma separated list of packages and a start:end range
+BASE_URL: str = "https://cranlogs.r-pkg.org/downloads/daily/{start}:{end}/{packages}"
+CRANLOGS_FIRST_DAY: datetime.date = datetime.date(2012, 10, 1)
+CRANLOGS_LAG_DAYS: int = 2 # cranlogs publishes the logs of a day with some delay
+MAX_PACKAGES_PER_QUERY: int = 50 # Keep the URL at a reasonable length
+logger = logging.getLogger("CRAN")
 
-def downloads_in_cran(package):
-    url:str = BASE_URL.format(package=package)
+def last_collected_day(filename:str) -> Optional[datetime.date]:
+    """
+    Parameters
+    ----------
+    filename : str
+        The csv file where the downloads of a package are saved.
+
+    Returns
+    -------
+    Optional[datetime.date]
+        The last day saved in the file, or None if nothing was collected yet.
+    """
+    if (not os.path.exists(filename)):
+        return None
+    with open(filename, "rt") as freader:
+        freader.readline() # Skip headers
+        # Dates are saved as YYYY-MM-DD so the string order is the date order
+        days = [line.split(",")[0] for line in freader if line.strip()]
+    return datetime.date.fromisoformat(max(days)) if days else None
+
+def _first_day_to_request(filename:str) -> datetime.date:
+    last_day = last_collected_day(filename)
+    return CRANLOGS_FIRST_DAY if last_day is None else last_day + datetime.timedelta(days=1)
+
+def fetch_downloads_in_cran(packages:list, start:datetime.date, end:datetime.date) -> bytes:
+    url:str = BASE_URL.format(start=start.isoformat(), end=end.isoformat(), packages=",".join(packages))
+    logger.info("Connecting to cranlogs to fetch downloads of {n} packages from {start} to {end}".format(n=len(packages), start=start, end=end))
     with urllib.request.urlopen(url) as response:
-        error_code:int = response.getcode()
-        logging.info("Connecting to cranlogs...")
-        if (error_code == 200):
-            logging.info("Succesfully connected to fetch cran downloads for: {package}".format(package=package))
-            data = response.read()
+        return response.read()
+
+def parse_downloads_in_cran(data:bytes, since:dict) -> dict:
+    """
+    Parameters
+    ----------
+    data : bytes
+        The response of the cranlogs daily downloads endpoint.
+    since : dict
+        {package: first day to keep}. Days before it were already collected.
+
+    Returns
+    -------
+    dict
+        {package: list of (day, downloads) rows}
+    """
+    json_data = json.loads(data)
+    if isinstance(json_data, dict): # A single package may not be wrapped in a list
+        json_data = [json_data]
+    downloads:dict = dict()
+    for entry in json_data:
+        package:str = entry["package"]
+        if package not in since:
+            continue
+        first_day:str = since[package].isoformat()
+        downloads[package] = [(day["day"], str(day["downloads"])) for day in entry["downloads"] if day["day"] >= first_day]
+    return downloads
+
+def parse_cran_page(data:bytes, since:dict) -> list:
+    """
+        Parses one response of fetch_cran_pages into a list of
+        (package, list of (day, downloads) rows)
+    """
+    return list(parse_downloads_in_cran(data, since).items())
+
+def days_to_request(packages:dict) -> tuple[dict, datetime.date]:
+    """
+    Parameters
+    ----------
+    packages : dict
+        {package: csv file where its downloads are saved}. The last day saved
+        in every file is used so only new days are requested.
+
+    Returns
+    -------
+    tuple[dict, datetime.date]
+        {package: first day to request} for the packages that are not up to
+        date, and the last day cranlogs can provide. Packages whose file
+        cannot be read are left out.
+    """
+    end:datetime.date = datetime.date.today() - datetime.timedelta(days=CRANLOGS_LAG_DAYS)
+    since:dict = dict()
+    for package, savefile in packages.items():
+        try:
+            first_day:datetime.date = _first_day_to_request(savefile)
+        except (OSError, ValueError) as error: # Unreadable file or a wrong date in it
+            logger.error("Could not read {file}, skipping {package}: {error}".format(file=savefile, package=package, error=error))
+            continue
+        if first_day > end:
+            logger.info("{package} is up to date".format(package=package))
         else:
-            logging.error("Error connecting to cranlogs to fetch downloads for: {package}".format(package=package))
\ No newline at end of file
+            since[package] = first_day
+    return since, end
+
+def fetch_cran_pages(since:dict, end:datetime.date):
+    """
+        Yields the response of every chunk of packages, so each chunk
+        can be parsed while the next one is downloaded
+    """
+    # Only packages missing the same days are queried together, so a new
+    # package does not make the others request their whole history again
+    by_start:dict = dict()
+    for package in sorted(since):
+        by_start.setdefault(since[package], []).append(package)
+    for start, pending in sorted(by_start.items()):
+        for idx in range(0, len(pending), MAX_PACKAGES_PER_QUERY):
+            yield fetch_downloads_in_cran(pending[idx:idx+MAX_PACKAGES_PER_QUERY], start, end)
+
+def save_cran_stats(downloads:list, cran_file:str) -> None:
+    if (not os.path.exists(cran_file)):
+        logger.info("File {cran_file} does not exist. Creating with headers".format(cran_file=cran_file))
+        with open(cran_file, "wt") as fwriter:
+            fwriter.write("Date,Downloads\n")
+    with open(cran_file, "at") as fwriter:
+        [fwriter.write(",".join(row)+"\n") for row in downloads]
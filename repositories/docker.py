@@ -10,18 +10,18 @@ import os
 import datetime
 import json
 import logging
-import urllib
+import urllib.request
 
 REPOSITORY_API_URL:str = "https://hub.docker.com/v2/repositories/{owner}/{repository}"
 logger = logging.getLogger("Docker")
 
-def connect_to_docker_API(url:str, owner:str, repo:str) -> dict:
+def fetch_from_docker_API(url:str, owner:str, repo:str) -> bytes:
     request = urllib.request.Request(url.format(owner=owner, repository=repo))
-    response = urllib.request.urlopen(request)
-    return json.loads(response.read())
+    with urllib.request.urlopen(request) as response:
+        return response.read()
 
-def get_docker_stats(API:str, owner:str, repo:str) -> tuple[int,int]:
-    data:dict = connect_to_docker_API(REPOSITORY_API_URL, owner, repo)
+def parse_docker_stats(response:bytes) -> tuple[int,int]:
+    data:dict = json.loads(response)
     pulls:int = data["pull_count"]
     stars:int = data["star_count"]
     logger.info("Pulls: {pulls}".format(pulls=pulls))
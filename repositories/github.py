@@ -11,9 +11,13 @@ import datetime
 import logging
 import json
 import os
+import re
 import urllib.request
+from typing import NamedTuple, Optional
 
 GITHUB_API_PER_PAGE_MAX:int = 100
+EMPTY_PAGE = re.compile(rb"\s*\[\s*\]\s*") # Found without decoding the page
+ISSUES_MAX_PAGES:int = 40 # Limit of pages to avoid infinite loops. 10 000 is too much to handle for now
 
 # Github API URLs
 GITHUB_API_URL:str = "https://api.github.com/repos/{owner}/{repo}/"
@@ -33,18 +37,42 @@ RELEASE_TAG: str = "tag_name"
 OWNER: str = "conesalab"
 REPO: str = "sqanti3"
 CLONES: str = "clones"
+VIEWS: str = "views"
+GITHUB_DATE_FORMAT: str = "%Y-%m-%dT%H:%M:%SZ"
+ISSUES_HEADER: str = "issue_id,open,creator,created_date,closing_date,number_of_comments,is_pull_request\n"
 
 logger = logging.getLogger("Github")
 
+# Records keep only the fields that are saved, instead of the whole JSON dict
+class TrafficCount(NamedTuple):
+    timestamp: datetime.datetime
+    count: int
+    uniques: int
 
-def connect_to_API(url:str, apikey:str, owner:str, repo:str) -> dict:
+class Issue(NamedTuple):
+    id: int # Issue ID showed in the github repo
+    open: bool
+    creator: str # User who opened the issue
+    created_date: datetime.datetime
+    closing_date: Optional[datetime.datetime] # None while the issue is open
+    number_of_comments: int
+    is_pull_request: bool
+
+def _parse_date(date:Optional[str]) -> Optional[datetime.datetime]:
+    return None if date is None else datetime.datetime.strptime(date, GITHUB_DATE_FORMAT)
+
+def _format_date(date:Optional[datetime.datetime]) -> str:
+    return str(None) if date is None else date.strftime(GITHUB_DATE_FORMAT)
+
+
+def fetch_from_API(url:str, apikey:str, owner:str, repo:str) -> bytes:
     pass_header:str = "Bearer {password}".format(password=apikey)
     authorization_header:str = "Authorization"
     header: dict = {authorization_header: pass_header}
     request = urllib.request.Request(url.format(owner=owner, repo=repo), headers=header)
     request.add_header(authorization_header, pass_header)
-    response = urllib.request.urlopen(request)
-    return json.loads(response.read())
+    with urllib.request.urlopen(request) as response:
+        return response.read()
 
 def save_referral_info(referrals:dict, filename:str) -> int:
     today = datetime.datetime.now()
@@ -79,67 +107,70 @@ def save_pages_info(pages:dict, save_path:str) -> int:
             fwriter.write(data)
     return 0
 
-def save_views_info(views:dict, save_path: str) -> int:
+def parse_traffic(data:bytes, key:str) -> list:
     """
-    
+    Parameters
+    ----------
+    data : bytes
+        The response of the traffic/views or traffic/clones endpoint.
+    key : str
+        The element with the counts: VIEWS or CLONES.
+
+    Returns
+    -------
+    list
+        A TrafficCount for every timestamp.
+    """
+    return [TrafficCount(_parse_date(x["timestamp"]), x["count"], x["uniques"]) for x in json.loads(data)[key]]
+
+def _save_traffic(traffic:list, filename:str, header:str) -> int:
+    if(os.path.exists(filename)):
+        with open(filename, "rt") as data:
+            knowntimestamps = set(map(lambda x: x.split(",")[0], data))
+        traffic = [x for x in traffic if _format_date(x.timestamp) not in knowntimestamps]
+    else:
+        with open(filename, "wt") as writer:
+            writer.write(header)
+    with open(filename, "at") as fwriter: # Opening in append text mode
+        for x in traffic:
+            fwriter.write(",".join([_format_date(x.timestamp), str(x.count), str(x.uniques)])+"\n")
+    return 0
+
+def save_views_info(views:list, save_path: str) -> int:
+    """
+    Saves the views that are not in the csv file yet.
 
     Parameters
     ----------
-    views : dict
-        DESCRIPTION.
+    views : list
+        TrafficCount records, as returned by parse_traffic.
     save_path : str
-        DESCRIPTION.
+        The csvfile where data will be saved.
 
     Returns
     -------
     int
-        DESCRIPTION.
+        0 if everything went correct.
 
     """
-    raw_views = views["views"]
-    if(os.path.exists(save_path)):
-        data = open(save_path,"rt")
-        knowntimestamps = set(map(lambda x: x.split(",")[0], data))
-        raw_views = list(filter(lambda x: False if x["timestamp"] in knowntimestamps else True, raw_views))
-        data.close()
-    else:
-        writer = open(save_path, "wt")
-        writer.write("Date,count,uniques\n")
-        writer.close()
-    data_rows = "\n".join(map(lambda x: ",".join([x["timestamp"], str(x["count"]), str(x["uniques"])]), raw_views))
-    with open(save_path, "at") as fwriter:
-        fwriter.write(data_rows+"\n")
-    return 0
+    return _save_traffic(views, save_path, "Date,count,uniques\n")
 
-def save_clone_info(clone_info:dict, filename: str) -> 0:
+def save_clone_info(clone_info:list, filename: str) -> 0:
     """
     Saves the clone info into a csv file. 
 
     Parameters
     ----------
-    clone_info : dict
-        DESCRIPTION.
+    clone_info : list
+        TrafficCount records, as returned by parse_traffic.
     filename : str
-        DESCRIPTION.
+        The csvfile where data will be saved.
 
     Returns
     -------
     int: 0 if everything went correct.
     """
-    timestamps_obj:list = clone_info[CLONES]
-    if(os.path.exists(filename)):
-        data = open(filename,"rt")
-        knowntimestamps = set(map(lambda x: x.split(",")[0], data))
-        timestamps_obj = list(filter(lambda x: False if x["timestamp"] in knowntimestamps else True, timestamps_obj))
-        data.close()
-    else:
-        writer = open(filename, "wt")
-        writer.write("Date,clones,uniques\n")
-        writer.close()
-    data = list(map(lambda x: ",".join([x["timestamp"], str(x["count"]), str(x["uniques"])]) ,timestamps_obj))
-    with open(filename, "at") as fwriter: # Opening in append text mode
-        [fwriter.write("{row}\n".format(row=x)) for x in data]
-    return 0
+    return _save_traffic(clone_info, filename, "Date,clones,uniques\n")
     
 def save_download_info(download_info:dict, filename):
     """
@@ -192,83 +223,83 @@ def _parse_downloads_of_release(json_release: dict) -> int:
         logger.warning(NO_ASSETS_WARNING.format(release=json_release[RELEASE_TAG]))
     return total_downloads
 
-def get_downloads_of_release(owner:str, repo:str) -> dict:
+def fetch_releases(owner:str, repo:str) -> bytes:
+    with urllib.request.urlopen(GITHUB_RELEASE_API_URL.format(owner=owner, repo=repo)) as response:
+        return response.read()
+
+def parse_downloads_of_releases(data:bytes) -> dict:
     """
     Parameters
     ----------
-    owner : str
-        The user that owns the repository.
-    repo : str
-        The name of the repository.
+    data : bytes
+        The response of the releases endpoint.
     Returns
     -------
     dict
         A dictionary with the key-value pairs corresponding to {version: downloads}.
     """
-    with urllib.request.urlopen(GITHUB_RELEASE_API_URL.format(owner=owner, repo=repo)) as response:
-        data:str = response.read()
-        json_data:dict = json.loads(data)
-        assets_counts: dict[str:int] = dict()
-        for release in json_data:
-            assets_counts[release[RELEASE_TAG]] = _parse_downloads_of_release(release)
+    json_data:dict = json.loads(data)
+    assets_counts: dict[str:int] = dict()
+    for release in json_data:
+        assets_counts[release[RELEASE_TAG]] = _parse_downloads_of_release(release)
     return assets_counts
 
-def _parse_issue(data:dict):
+def _parse_issue(data:dict) -> Issue:
     """
         Parses issues recived from the API to keep only
         relevant information
     """
-    id:str = str(data["number"]) # Issue ID showed in the github repo
-    open:str = True if data["state"] == "open" else False # Whether the issue is open or not
-    username_poster:str = data["user"]["login"] # User who opened the issue
-    creation_date:str = data["created_at"] # Date when the issue was opened
-    closed_date:str = None if data["closed_at"] == "null" else data["closed_at"] # When the issue was closed
-    number_of_comments:int = data["comments"]
-    is_pull_request:bool = "pull_request" in data.keys()
-    return [id, open, username_poster, creation_date, closed_date, number_of_comments, is_pull_request]
-                       
-
-
-def get_issues(issues_url:str, apikey:str, owner:str, repo:str):
-    issues = []
-    page:int = 0
+    return Issue(id=data["number"],
+                 open=data["state"] == "open",
+                 creator=data["user"]["login"],
+                 created_date=_parse_date(data["created_at"]),
+                 closing_date=_parse_date(data["closed_at"]), # null while open
+                 number_of_comments=data["comments"],
+                 is_pull_request="pull_request" in data)
+
+def _issue_to_row(issue:Issue) -> list:
+    return [str(issue.id), str(issue.open), issue.creator, _format_date(issue.created_date),
+            _format_date(issue.closing_date), str(issue.number_of_comments), str(issue.is_pull_request)]
+
+def fetch_issue_pages(issues_url:str, apikey:str, owner:str, repo:str):
+    """
+        Yields the raw response of every page of issues, so each page
+        can be parsed while the next one is downloaded
+    """
+    page:int = 1 # Github pages start at 1, page 0 is the same as page 1
     while True:
         API_PAGE:str = issues_url+str(page)
-        api_issues = connect_to_API(API_PAGE, apikey, owner, repo) # Connect to the endpoint
-        if api_issues == []: break # Finish when no more issues are found
+        api_issues:bytes = fetch_from_API(API_PAGE, apikey, owner, repo) # Connect to the endpoint
+        if EMPTY_PAGE.fullmatch(api_issues): break # Finish when no more issues are found
         else :
             logger.info("Page {page} of issues found".format(page=page))
-            issues += api_issues
+            yield api_issues
             page += 1
-        if page == 40: # Limit of pages to avoid infinite loops. 10 000 is too much to handle for now
-            logger.warning("Limit of 40 pages reached. Stopping")
+        if page > ISSUES_MAX_PAGES:
+            logger.warning("Limit of {} pages reached. Stopping".format(ISSUES_MAX_PAGES))
             break
-    info:list = list(map(_parse_issue, issues))
-    return info
 
-def save_issues(issues:list, filename:str):
+def parse_issue_page(data:bytes) -> list:
+    return list(map(_parse_issue, json.loads(data)))
+
+def save_issues(issues, filename:str):
     """
     Saves parsed info into a csv file
     """
-    if (not os.path.exists(filename)):
-        with open(filename, "wt") as head_writer:
-            head_writer.write("issue_id,open,creator,created_date,closing_date,number_of_comments,is_pull_request\n")
-    saved_issues = []
+    saved_issues:dict = dict() # {issue_id: row}, keeps the order of the file
+    if (os.path.exists(filename)):
+        with open(filename, "rt") as saved_issues_fhand:
+            saved_issues_fhand.readline() # read the file without headers
+            for line in saved_issues_fhand:
+                row = line.strip("\n").split(",")
+                saved_issues[row[0]] = row
     # Issues will be updated if the saved issues and the downloaded one is different
-    with open(filename, "rt") as saved_issues_fhand:
-        saved_issues_fhand.readline() # read the file without headers
-        for line in saved_issues_fhand:
-            saved_issues.append(line.strip("\n").split(","))
+    for issue in issues:
+        row = _issue_to_row(issue)
+        if row[0] in saved_issues:
+            logger.info("Issue {issue} was updated".format(issue=row[0]))
+        saved_issues[row[0]] = row
     with open(filename, "wt") as body_writer:
-        body_writer.write("issue_id,open,creator,created_date,closing_date,number_of_comments,is_pull_request\n")
-        for issue in issues:
-            for idx, saved_issue in enumerate(saved_issues):
-                if issue[0] == saved_issue[0]:
-                    logger.info("Issue {issue} was updated".format(issue=issue[0]))
-                    saved_issues[idx] = issue
-                    break
-            else:
-                saved_issues.append(issue)
-        for saved_issue in saved_issues:
-            body_writer.write(",".join(map(str, saved_issue))+"\n")
-
+        body_writer.write(ISSUES_HEADER)
+        for saved_issue in saved_issues.values():
+            body_writer.write(",".join(saved_issue)+"\n")
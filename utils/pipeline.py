@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:40:02 2026
+
+@author: frobledo
+
+Runs the collection as three stages connected by bounded queues:
+fetchers download the responses, a parser turns them into records and a
+single writer saves them. A full queue makes the previous stage wait, so
+memory does not grow with the number of tools to monitor.
+"""
+
+import asyncio
+import logging
+import time
+import urllib.error
+from typing import Callable, NamedTuple
+
+FETCHERS: int = 4
+QUEUE_SIZE: int = 16
+
+# Markers sent after the payloads of a job
+_END = object() # Every payload of the job was sent
+_FAILED = object() # The job could not be completed, nothing else must be saved
+
+logger = logging.getLogger("Pipeline")
+
+class Job(NamedTuple):
+    """
+        One element to collect, e.g. the clones of a github repository.
+
+        fetch returns the raw response and save receives what parse returns.
+        If paged, fetch returns an iterable of responses instead, and every
+        one of them is parsed and saved on its own as soon as it arrives.
+        Savers that rewrite the whole file, like github.save_issues, need
+        every record at once: with merge, the parsed lists are kept and
+        joined, and save is called once all of them have arrived.
+    """
+    name: str
+    logger: str
+    fetch: Callable
+    parse: Callable
+    save: Callable
+    paged: bool = False
+    merge: bool = False # Only for paged jobs
+    hint: str = "" # Shown when the service refuses the connection
+
+class StageStats:
+    """
+        Items processed, time spent and peak depth of the queue where the
+        stage puts its output. busy is the time spent working, summed over
+        every worker of the stage, so it can be longer than the run. The
+        wall time goes from the first item started to the last finished,
+        and the throughput is measured over it.
+    """
+    def __init__(self, name:str, queue_size:int=0):
+        self.name:str = name
+        self.items:int = 0
+        self.busy:float = 0.0
+        self.first_start:float = None
+        self.last_finish:float = None
+        self.max_depth:int = 0
+        self.queue_size:int = queue_size
+
+    def add(self, started:float, finished:float, items:int=1):
+        self.items += items
+        self.busy += finished-started
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_finish = finished if self.last_finish is None else max(self.last_finish, finished)
+
+    def wall(self) -> float:
+        return 0.0 if self.first_start is None else self.last_finish-self.first_start
+
+    def report(self) -> str:
+        wall:float = self.wall()
+        throughput:float = self.items/wall if wall else 0.0
+        text:str = "{name}: {items} items in {wall:.2f}s wall ({throughput:.1f} items/s), {busy:.2f}s busy summed over workers".format(
+            name=self.name, items=self.items, wall=wall, throughput=throughput, busy=self.busy)
+        if self.queue_size:
+            text += ", output queue peak {depth}/{size}".format(depth=self.max_depth, size=self.queue_size)
+        return text
+
+async def _put(queue:asyncio.Queue, item:tuple, stats:StageStats):
+    await queue.put(item) # Waits while the queue is full
+    stats.max_depth = max(stats.max_depth, queue.qsize())
+
+def _run_timed(function:Callable, *args) -> tuple:
+    # Measured inside the worker thread, so waiting for a free thread is not counted
+    started:float = time.perf_counter()
+    result = function(*args)
+    return result, started, time.perf_counter()
+
+async def _timed(stats:StageStats, function:Callable, *args):
+    result, started, finished = await asyncio.to_thread(_run_timed, function, *args)
+    stats.add(started, finished, 0 if result is _END else 1)
+    return result
+
+async def _fetcher(jobs, parse_queue:asyncio.Queue, stats:StageStats):
+    # Every fetcher takes the next job from the shared iterator
+    for job in jobs:
+        job_logger = logging.getLogger(job.logger)
+        job_logger.info("Fetching {}".format(job.name))
+        try:
+            if job.paged:
+                pages = iter(await asyncio.to_thread(job.fetch))
+                while (page := await _timed(stats, next, pages, _END)) is not _END:
+                    await _put(parse_queue, (job, page), stats)
+            else:
+                await _put(parse_queue, (job, await _timed(stats, job.fetch)), stats)
+        except urllib.error.HTTPError as httperror:
+            job_logger.error("Could not fetch {job} due to the error: {error}. {hint}".format(job=job.name, error=httperror, hint=job.hint))
+            await _put(parse_queue, (job, _FAILED), stats)
+            continue
+        except Exception as error:
+            job_logger.error("Could not fetch {job}: {error}".format(job=job.name, error=error))
+            await _put(parse_queue, (job, _FAILED), stats)
+            continue
+        await _put(parse_queue, (job, _END), stats)
+
+async def _parser(parse_queue:asyncio.Queue, save_queue:asyncio.Queue, stats:StageStats):
+    while (item := await parse_queue.get()) is not None:
+        job, payload = item
+        if payload is not _END and payload is not _FAILED:
+            try:
+                payload = await _timed(stats, job.parse, payload)
+            except Exception as error:
+                logging.getLogger(job.logger).error("Could not parse {job}: {error}".format(job=job.name, error=error))
+                payload = _FAILED
+        await _put(save_queue, (job, payload), stats)
+    await save_queue.put(None)
+
+async def _save(job:Job, data, stats:StageStats) -> bool:
+    try:
+        await _timed(stats, job.save, data)
+        return True
+    except Exception as error:
+        logging.getLogger(job.logger).error("Could not save {job}. Check disk usage or availability: {error}".format(job=job.name, error=error))
+        return False
+
+async def _writer(save_queue:asyncio.Queue, stats:StageStats):
+    pending:dict = dict() # Parsed records of the merge jobs that are not complete yet
+    failed:set = set()
+    while (item := await save_queue.get()) is not None:
+        job, payload = item
+        if payload is _FAILED:
+            pending.pop(job, None)
+            failed.add(job)
+        elif job in failed:
+            continue
+        elif payload is _END:
+            if job.merge and not await _save(job, pending.pop(job, []), stats):
+                continue
+            logging.getLogger(job.logger).info("Saved {}".format(job.name))
+        elif job.merge:
+            pending.setdefault(job, []).extend(payload)
+        elif not await _save(job, payload, stats):
+            failed.add(job) # Keep what was saved, but do not add more to it
+
+async def _run(jobs:list, fetchers:int, queue_size:int) -> list:
+    parse_queue:asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    save_queue:asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    fetch_stats = StageStats("fetch", queue_size)
+    parse_stats = StageStats("parse", queue_size)
+    write_stats = StageStats("write")
+    parser = asyncio.create_task(_parser(parse_queue, save_queue, parse_stats))
+    writer = asyncio.create_task(_writer(save_queue, write_stats))
+    shared_jobs = iter(jobs)
+    await asyncio.gather(*[_fetcher(shared_jobs, parse_queue, fetch_stats) for _ in range(fetchers)])
+    await parse_queue.put(None) # No more jobs
+    await asyncio.gather(parser, writer)
+    return [fetch_stats, parse_stats, write_stats]
+
+def run(jobs:list, fetchers:int=FETCHERS, queue_size:int=QUEUE_SIZE) -> list:
+    """
+    Parameters
+    ----------
+    jobs : list
+        The Job elements to collect.
+    fetchers : int
+        Number of downloads running at the same time.
+    queue_size : int
+        Maximum number of elements waiting between two stages.
+
+    Returns
+    -------
+    list
+        The StageStats of the fetch, parse and write stages.
+    """
+    logger.info("Running {jobs} jobs with {fetchers} fetchers".format(jobs=len(jobs), fetchers=fetchers))
+    started:float = time.perf_counter()
+    stats:list = asyncio.run(_run(jobs, max(1, fetchers), max(1, queue_size)))
+    logger.info("Finished in {:.2f}s".format(time.perf_counter()-started))
+    for stage in stats:
+        logger.info(stage.report())
+    return stats